@@ -1,4 +1,5 @@
 from .graph import create_graph
+from .graph import get_graph
 from .graph import get_response
 from .state import Plan
 from .state import PlanDraft
@@ -7,6 +8,7 @@ from .state import PlanStep
 
 __all__ = [
     "create_graph",
+    "get_graph",
     "get_response",
     "PlanningState",
     "Plan",
@@ -0,0 +1,572 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
+from collections.abc import Sequence
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.base import ChannelVersions
+from langgraph.checkpoint.base import Checkpoint
+from langgraph.checkpoint.base import CheckpointMetadata
+from langgraph.checkpoint.base import CheckpointTuple
+from langgraph.checkpoint.base import get_checkpoint_id
+from langgraph.checkpoint.base import get_checkpoint_metadata
+from langgraph.checkpoint.base import WRITES_IDX_MAP
+from langgraph.checkpoint.base import writes_sort_key
+from langgraph.checkpoint.memory import InMemorySaver
+
+Typed = tuple[str, bytes]
+Write = tuple[str, str, Typed, str]  # task_id, channel, value, task_path
+
+DEFAULT_MAX_RESIDENT_BYTES = 64 * 1024 * 1024
+DEFAULT_IDLE_SECONDS = 15 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, parent_id TEXT,
+    type TEXT, checkpoint BLOB, metadata_type TEXT, metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT, checkpoint_ns TEXT, channel TEXT, version TEXT,
+    type TEXT, value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, task_id TEXT,
+    idx INTEGER, channel TEXT, type TEXT, value BLOB, task_path TEXT,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class HotCheckpoint:
+    """Latest checkpoint of one (thread, namespace), held fully in memory."""
+
+    __slots__ = (
+        "checkpoint_id",
+        "parent_id",
+        "checkpoint",
+        "metadata",
+        "versions",
+        "blobs",
+        "writes",
+        "dirty",
+        "last_access",
+        "size",
+    )
+
+    def __init__(
+        self,
+        checkpoint_id: str,
+        parent_id: str | None,
+        checkpoint: Typed,
+        metadata: Typed,
+        versions: ChannelVersions,
+        blobs: dict[str, Typed],
+        writes: dict[tuple[str, int], Write],
+        dirty: bool,
+    ):
+        self.checkpoint_id = checkpoint_id
+        self.parent_id = parent_id
+        self.checkpoint = checkpoint
+        self.metadata = metadata
+        self.versions = versions
+        self.blobs = blobs
+        self.writes = writes
+        self.dirty = dirty
+        self.last_access = 0.0
+        self.size = (
+            len(checkpoint[1])
+            + len(metadata[1])
+            + sum(len(v[1]) for v in blobs.values())
+            + sum(len(w[2][1]) for w in writes.values())
+        )
+
+
+class TieredCheckpointSaver(BaseCheckpointSaver[str]):
+    """Checkpointer that keeps only hot, latest checkpoints in memory.
+
+    The latest checkpoint of each recently used (thread, namespace) is held in
+    memory under `max_resident_bytes`. Superseded checkpoints, least recently
+    used entries over budget, and entries idle for `idle_seconds` spill to a
+    local SQLite file and are reloaded transparently on access.
+    """
+
+    get_next_version = InMemorySaver.get_next_version
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_resident_bytes: int = DEFAULT_MAX_RESIDENT_BYTES,
+        idle_seconds: float = DEFAULT_IDLE_SECONDS,
+        clock=time.monotonic,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self._tmpdir = None
+        if not path:
+            self._tmpdir = tempfile.TemporaryDirectory(prefix="planning-agent-")
+            path = os.path.join(self._tmpdir.name, "checkpoints.sqlite")
+        self.path = path
+        self.max_resident_bytes = max_resident_bytes
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._hot: OrderedDict[tuple[str, str], HotCheckpoint] = OrderedDict()
+        self._resident_bytes = 0
+        self._stats = {
+            "hot_hits": 0,
+            "disk_reads": 0,
+            "spilled_checkpoints": 0,
+            "evictions_budget": 0,
+            "evictions_idle": 0,
+        }
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    # ---- metrics ----
+
+    def metrics(self) -> dict[str, Any]:
+        """Resident size, eviction counts and disk tier size."""
+        with self._lock:
+            return {
+                "resident_bytes": self._resident_bytes,
+                "max_resident_bytes": self.max_resident_bytes,
+                "resident_checkpoints": len(self._hot),
+                "resident_threads": len({thread_id for thread_id, _ in self._hot}),
+                "disk_bytes": sum(
+                    os.path.getsize(path)
+                    for path in (self.path, self.path + "-wal")
+                    if os.path.exists(path)
+                ),
+                **self._stats,
+            }
+
+    # ---- hot tier ----
+
+    def _touch(self, key: tuple[str, str], entry: HotCheckpoint) -> None:
+        entry.last_access = self._clock()
+        self._hot.move_to_end(key)
+
+    def _admit(self, key: tuple[str, str], entry: HotCheckpoint) -> None:
+        old = self._hot.pop(key, None)
+        if old is not None:
+            self._resident_bytes -= old.size
+            self._spill(key, old)
+        self._hot[key] = entry
+        self._resident_bytes += entry.size
+        self._touch(key, entry)
+        self._enforce_limits()
+
+    def _evict(self, key: tuple[str, str], reason: str) -> None:
+        entry = self._hot.pop(key)
+        self._resident_bytes -= entry.size
+        self._spill(key, entry)
+        self._stats[f"evictions_{reason}"] += 1
+
+    def _enforce_limits(self) -> None:
+        while self._resident_bytes > self.max_resident_bytes and self._hot:
+            self._evict(next(iter(self._hot)), "budget")
+        cutoff = self._clock() - self.idle_seconds
+        while self._hot:
+            key, entry = next(iter(self._hot.items()))
+            if entry.last_access > cutoff:
+                break
+            self._evict(key, "idle")
+
+    def _spill(self, key: tuple[str, str], entry: HotCheckpoint) -> None:
+        """Write a hot entry to disk if it has changes not yet persisted."""
+        if not entry.dirty:
+            return
+        thread_id, checkpoint_ns = key
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    entry.checkpoint_id,
+                    entry.parent_id,
+                    *entry.checkpoint,
+                    *entry.metadata,
+                ),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (thread_id, checkpoint_ns, channel, str(version), *blob)
+                    for channel, version in entry.versions.items()
+                    if (blob := entry.blobs.get(channel)) is not None
+                ],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        thread_id,
+                        checkpoint_ns,
+                        entry.checkpoint_id,
+                        task_id,
+                        idx,
+                        channel,
+                        *value,
+                        task_path,
+                    )
+                    for (task_id, idx), (_, channel, value, task_path) in (
+                        entry.writes.items()
+                    )
+                ],
+            )
+        entry.dirty = False
+        self._stats["spilled_checkpoints"] += 1
+
+    def flush(self) -> None:
+        """Persist all hot entries to disk without evicting them."""
+        with self._lock:
+            for key, entry in self._hot.items():
+                self._spill(key, entry)
+
+    # ---- disk tier ----
+
+    def _read_blobs(
+        self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions
+    ) -> dict[str, Typed]:
+        blobs = {}
+        for channel, version in versions.items():
+            row = self._conn.execute(
+                "SELECT type, value FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is not None:
+                blobs[channel] = (row[0], row[1])
+        return blobs
+
+    def _read_writes(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str
+    ) -> dict[tuple[str, int], Write]:
+        rows = self._conn.execute(
+            "SELECT task_id, idx, channel, type, value, task_path FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        )
+        return {
+            (task_id, idx): (task_id, channel, (type_, value), task_path)
+            for task_id, idx, channel, type_, value, task_path in rows
+        }
+
+    def _read_checkpoint(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str | None
+    ) -> HotCheckpoint | None:
+        """Load a checkpoint (latest when checkpoint_id is None) from disk."""
+        query = (
+            "SELECT checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata "
+            "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+        )
+        if checkpoint_id:
+            row = self._conn.execute(
+                query + "AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchone()
+        else:
+            row = self._conn.execute(
+                query + "ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+        if row is None:
+            return None
+        self._stats["disk_reads"] += 1
+        checkpoint_id, parent_id, type_, checkpoint, meta_type, metadata = row
+        versions = self.serde.loads_typed((type_, checkpoint))["channel_versions"]
+        return HotCheckpoint(
+            checkpoint_id=checkpoint_id,
+            parent_id=parent_id,
+            checkpoint=(type_, checkpoint),
+            metadata=(meta_type, metadata),
+            versions=versions,
+            blobs=self._read_blobs(thread_id, checkpoint_ns, versions),
+            writes=self._read_writes(thread_id, checkpoint_ns, checkpoint_id),
+            dirty=False,
+        )
+
+    # ---- BaseCheckpointSaver API ----
+
+    def _to_tuple(
+        self, thread_id: str, checkpoint_ns: str, entry: HotCheckpoint
+    ) -> CheckpointTuple:
+        checkpoint: Checkpoint = self.serde.loads_typed(entry.checkpoint)
+        writes = sorted(
+            entry.writes.items(), key=lambda kv: writes_sort_key(kv[1][3], *kv[0])
+        )
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": entry.checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": {
+                    channel: self.serde.loads_typed(blob)
+                    for channel, blob in entry.blobs.items()
+                    if blob[0] != "empty"
+                },
+            },
+            metadata=self.serde.loads_typed(entry.metadata),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed(value))
+                for _, (task_id, channel, value, _) in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": entry.parent_id,
+                    }
+                }
+                if entry.parent_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        key = (thread_id, checkpoint_ns)
+        with self._lock:
+            entry = self._hot.get(key)
+            if entry and checkpoint_id in (None, entry.checkpoint_id):
+                self._stats["hot_hits"] += 1
+                self._touch(key, entry)
+                self._enforce_limits()
+                return self._to_tuple(thread_id, checkpoint_ns, entry)
+
+            loaded = self._read_checkpoint(thread_id, checkpoint_ns, checkpoint_id)
+            if loaded is None:
+                return None
+            if entry is None and checkpoint_id is None:
+                self._admit(key, loaded)
+            return self._to_tuple(thread_id, checkpoint_ns, loaded)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        self.flush()
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (
+                checkpoint_ns := config["configurable"].get("checkpoint_ns")
+            ) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT thread_id, checkpoint_ns, checkpoint_id FROM checkpoints {where}"
+                "ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC",
+                params,
+            ).fetchall()
+
+        for thread_id, checkpoint_ns, checkpoint_id in rows:
+            if limit is not None and limit <= 0:
+                break
+            with self._lock:
+                entry = self._read_checkpoint(thread_id, checkpoint_ns, checkpoint_id)
+            if entry is None:
+                continue
+            if filter:
+                metadata = self.serde.loads_typed(entry.metadata)
+                if not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+            if limit is not None:
+                limit -= 1
+            yield self._to_tuple(thread_id, checkpoint_ns, entry)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        c = checkpoint.copy()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        values: dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+        versions = c["channel_versions"]
+        key = (thread_id, checkpoint_ns)
+
+        with self._lock:
+            previous = self._hot.get(key)
+            blobs: dict[str, Typed] = {}
+            missing: dict[str, Any] = {}
+            for channel, version in versions.items():
+                if channel in new_versions:
+                    blobs[channel] = (
+                        self.serde.dumps_typed(values[channel])
+                        if channel in values
+                        else ("empty", b"")
+                    )
+                elif previous and previous.versions.get(channel) == version:
+                    blobs[channel] = previous.blobs[channel]
+                else:
+                    missing[channel] = version
+            if missing:
+                blobs.update(self._read_blobs(thread_id, checkpoint_ns, missing))
+
+            self._admit(
+                key,
+                HotCheckpoint(
+                    checkpoint_id=checkpoint["id"],
+                    parent_id=config["configurable"].get("checkpoint_id"),
+                    checkpoint=self.serde.dumps_typed(c),
+                    metadata=self.serde.dumps_typed(
+                        get_checkpoint_metadata(config, metadata)
+                    ),
+                    versions=dict(versions),
+                    blobs=blobs,
+                    writes={},
+                    dirty=True,
+                ),
+            )
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        key = (thread_id, checkpoint_ns)
+
+        with self._lock:
+            entry = self._hot.get(key)
+            if entry is None or entry.checkpoint_id != checkpoint_id:
+                existing = self._read_writes(thread_id, checkpoint_ns, checkpoint_id)
+                entry = None
+            else:
+                existing = entry.writes
+
+            new_writes: dict[tuple[str, int], Write] = {}
+            for idx, (channel, value) in enumerate(writes):
+                inner_key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+                if inner_key[1] >= 0 and inner_key in existing:
+                    continue
+                new_writes[inner_key] = (
+                    task_id,
+                    channel,
+                    self.serde.dumps_typed(value),
+                    task_path,
+                )
+
+            if entry is not None:
+                for inner_key, write in new_writes.items():
+                    if old := entry.writes.get(inner_key):
+                        entry.size -= len(old[2][1])
+                        self._resident_bytes -= len(old[2][1])
+                    entry.writes[inner_key] = write
+                    entry.size += len(write[2][1])
+                    self._resident_bytes += len(write[2][1])
+                entry.dirty = True
+                self._touch(key, entry)
+                self._enforce_limits()
+                return
+
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            thread_id,
+                            checkpoint_ns,
+                            checkpoint_id,
+                            t_id,
+                            idx,
+                            channel,
+                            *value,
+                            path,
+                        )
+                        for (t_id, idx), (_, channel, value, path) in new_writes.items()
+                    ],
+                )
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._hot if key[0] == thread_id]:
+                self._resident_bytes -= self._hot.pop(key).size
+            with self._conn:
+                for table in ("checkpoints", "blobs", "writes"):
+                    self._conn.execute(
+                        f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,)
+                    )
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return self.delete_thread(thread_id)
@@ -0,0 +1,256 @@
+import re
+from typing import Literal
+
+from langchain_core.messages import AIMessage
+from langchain_core.messages import HumanMessage
+from pydantic import BaseModel
+
+from .nodes import commit_plan
+from .nodes import format_plan_for_prompt
+from .nodes import should_compress_check
+from .state import get_state_value
+from .state import Plan
+from .state import PlanDraft
+from .state import PlanningState
+from .state import PlanVersion
+from .state import StepStatus
+
+CommandAction = Literal[
+    "set_status",
+    "rename_step",
+    "rename_plan",
+    "undo",
+    "restore_version",
+    "show_version",
+    "show_plan",
+]
+
+STATUS_WORDS: dict[str, StepStatus] = {
+    "done": "completed",
+    "complete": "completed",
+    "completed": "completed",
+    "finished": "completed",
+    "in progress": "in_progress",
+    "in-progress": "in_progress",
+    "started": "in_progress",
+    "pending": "pending",
+    "todo": "pending",
+    "to do": "pending",
+    "not done": "pending",
+    "incomplete": "pending",
+}
+_STATUS = "|".join(sorted(map(re.escape, STATUS_WORDS), key=len, reverse=True))
+_PLEASE = r"(?:please\s+)?"
+
+# each pattern must match the whole message, anything else goes to the LLM;
+# the middle entry fixes the status for shortcuts like "complete step 3"
+COMMAND_PATTERNS: list[tuple[CommandAction, StepStatus | None, re.Pattern]] = [
+    (
+        "set_status",
+        None,
+        re.compile(
+            rf"{_PLEASE}mark\s+step\s+(?P<step>\d+)\s+(?:as\s+)?(?P<status>{_STATUS})",
+            re.I,
+        ),
+    ),
+    (
+        "set_status",
+        None,
+        re.compile(
+            rf"step\s+(?P<step>\d+)\s+is\s+(?:now\s+)?(?P<status>{_STATUS})", re.I
+        ),
+    ),
+    (
+        "set_status",
+        "completed",
+        re.compile(rf"{_PLEASE}(?:complete|finish)\s+step\s+(?P<step>\d+)", re.I),
+    ),
+    (
+        "set_status",
+        "in_progress",
+        re.compile(rf"{_PLEASE}start\s+step\s+(?P<step>\d+)", re.I),
+    ),
+    (
+        "rename_step",
+        None,
+        re.compile(
+            rf"{_PLEASE}rename\s+step\s+(?P<step>\d+)\s+to\s+(?P<title>.+)", re.I
+        ),
+    ),
+    (
+        "rename_plan",
+        None,
+        re.compile(rf"{_PLEASE}rename\s+(?:the\s+)?plan\s+to\s+(?P<title>.+)", re.I),
+    ),
+    (
+        "undo",
+        None,
+        re.compile(
+            rf"{_PLEASE}(?:undo|revert)(?:\s+(?:the\s+)?last\s+(?:change|edit))?", re.I
+        ),
+    ),
+    (
+        "restore_version",
+        None,
+        re.compile(
+            rf"{_PLEASE}(?:revert|restore|roll\s*back)\s+to\s+(?:plan\s+)?version\s+(?P<version>\d+)",
+            re.I,
+        ),
+    ),
+    (
+        "show_version",
+        None,
+        re.compile(
+            rf"{_PLEASE}show\s+(?:me\s+)?(?:the\s+)?(?:plan\s+)?(?:version\s+|v)(?P<version>\d+)",
+            re.I,
+        ),
+    ),
+    (
+        "show_plan",
+        None,
+        re.compile(rf"{_PLEASE}show\s+(?:me\s+)?(?:the\s+)?(?:current\s+)?plan", re.I),
+    ),
+]
+
+# a rename that looks like it carries a second instruction is left to the LLM
+COMPOUND_TITLE = re.compile(
+    r"[;?]|\b(?:and|then)\s+(?:also\s+)?(?:add|remove|delete|mark|move|change|rename|split|merge)\b",
+    re.I,
+)
+
+
+class Command(BaseModel):
+    action: CommandAction
+    step_number: int | None = None
+    status: StepStatus | None = None
+    title: str | None = None
+    version: int | None = None
+
+
+def parse_command(text: str) -> Command | None:
+    """Parse a deterministic plan command. Returns None when unsure."""
+    text = text.strip().rstrip(".!")
+    if not text or "\n" in text:
+        return None
+
+    for action, fixed_status, pattern in COMMAND_PATTERNS:
+        match = pattern.fullmatch(text)
+        if not match:
+            continue
+        groups = match.groupdict()
+        step = int(groups["step"]) if groups.get("step") else None
+        version = int(groups["version"]) if groups.get("version") else None
+
+        if action == "set_status":
+            status = fixed_status or STATUS_WORDS[groups["status"].lower()]
+            return Command(action=action, step_number=step, status=status)
+        if action in ("rename_step", "rename_plan"):
+            title = groups["title"].strip().strip("\"'").strip()
+            if not title or COMPOUND_TITLE.search(title):
+                return None
+            return Command(action=action, step_number=step, title=title)
+        return Command(action=action, version=version)
+    return None
+
+
+def _last_user_text(state: PlanningState) -> str:
+    messages = get_state_value(state, "messages")
+    if not messages or not isinstance(messages[-1], HumanMessage):
+        return ""
+    content = messages[-1].content
+    return content if isinstance(content, str) else ""
+
+
+def _find_version(state: PlanningState, version: int | None) -> Plan | None:
+    if version is None:
+        return None
+    current_plan = get_state_value(state, "current_plan")
+    if current_plan and current_plan.version == version:
+        return current_plan
+    for pv in get_state_value(state, "plan_versions"):
+        if pv.plan.version == version:
+            return pv.plan
+    return None
+
+
+def _undo_target(plan_versions: list[PlanVersion]) -> Plan | None:
+    """The plan before the current one, skipping back over versions made by undo."""
+    positions = {pv.plan.version: i for i, pv in enumerate(plan_versions)}
+    index = len(plan_versions)  # the current plan comes after the archive
+    while index > 0:
+        previous = plan_versions[index - 1]
+        if previous.undo_to is None:
+            return previous.plan
+        # the plan at `index` is an undo to `undo_to`; continue from there
+        index = positions.get(previous.undo_to, 0)
+    return None
+
+
+def route_input(state: PlanningState) -> Literal["command", "compress", "agent"]:
+    """Send recognized plan commands to the local fast path, everything else to the LLM."""
+    if get_state_value(state, "current_plan") and parse_command(_last_user_text(state)):
+        return "command"
+    return should_compress_check(state)
+
+
+def _reply(content: str, **updates) -> dict:
+    return {"messages": [AIMessage(content=content)], **updates}
+
+
+def local_command_node(state: PlanningState) -> dict:
+    """Apply a parsed command directly to the plan without an LLM call."""
+    command = parse_command(_last_user_text(state))
+    current_plan = get_state_value(state, "current_plan")
+    plan_versions = list(get_state_value(state, "plan_versions"))
+    if command is None or current_plan is None:
+        return {}  # route_input only sends parsed commands with a plan here
+
+    if command.action == "show_plan":
+        return _reply(format_plan_for_prompt(current_plan))
+
+    if command.action == "show_version":
+        plan = _find_version(state, command.version)
+        if plan is None:
+            return _reply(f"There is no version {command.version} of the plan.")
+        return _reply(format_plan_for_prompt(plan))
+
+    undo_to = None
+    if command.action == "undo":
+        target = _undo_target(plan_versions)
+        if target is None:
+            return _reply("There are no earlier versions to undo to.")
+        undo_to = target.version
+    elif command.action == "restore_version":
+        target = _find_version(state, command.version)
+        if target is None:
+            return _reply(f"There is no version {command.version} of the plan.")
+        if target is current_plan:
+            return _reply(f"The plan is already at version {command.version}.")
+    elif command.action == "rename_plan":
+        target = current_plan.model_copy(update={"title": command.title})
+    else:
+        steps = [step.model_copy() for step in current_plan.steps]
+        step = next((s for s in steps if s.step_number == command.step_number), None)
+        if step is None:
+            return _reply(
+                f"There is no step {command.step_number} in the current plan."
+            )
+        if command.action == "rename_step":
+            step.title = command.title
+        else:
+            step.status = command.status
+        target = current_plan.model_copy(update={"steps": steps})
+
+    draft = PlanDraft(title=target.title, steps=target.steps, metadata=target.metadata)
+    new_plan, plan_versions, changes = commit_plan(
+        current_plan, plan_versions, draft, undo_to=undo_to
+    )
+    if not changes:
+        return _reply("No changes needed, the plan is already up to date.")
+
+    summary = "\n".join(changes)
+    return _reply(
+        f"Updated the plan to version {new_plan.version}:\n{summary}",
+        current_plan=new_plan,
+        plan_versions=plan_versions,
+    )
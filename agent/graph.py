@@ -1,13 +1,27 @@
+import os
+import threading
+from functools import lru_cache
+
 from langchain_core.messages import HumanMessage
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END
 from langgraph.graph import START
 from langgraph.graph import StateGraph
 
+from .checkpoint import DEFAULT_IDLE_SECONDS
+from .checkpoint import DEFAULT_MAX_RESIDENT_BYTES
+from .checkpoint import TieredCheckpointSaver
+from .commands import local_command_node
+from .commands import route_input
 from .nodes import compress_context_node
+from .nodes import llm_client
+from .nodes import MAX_PARALLEL_PHASES
+from .nodes import merge_phases_node
+from .nodes import phase_steps_node
 from .nodes import planning_agent_node
-from .nodes import should_compress_check
+from .nodes import route_after_agent
+from .scheduler import TurnScheduler
 from .state import PlanningState
+from utils.token_counter import get_encoding
 
 
 def create_graph():
@@ -15,23 +29,68 @@ def create_graph():
 
     graph.add_node("compress", compress_context_node)
     graph.add_node("agent", planning_agent_node)
+    graph.add_node("command", local_command_node)
+    graph.add_node("phase", phase_steps_node)
+    graph.add_node("merge_phases", merge_phases_node)
 
     graph.add_conditional_edges(
-        START, should_compress_check, {"compress": "compress", "agent": "agent"}
+        START,
+        route_input,
+        {"command": "command", "compress": "compress", "agent": "agent"},
     )
+    graph.add_edge("command", END)
     graph.add_edge("compress", "agent")
-    graph.add_edge("agent", END)
+    graph.add_conditional_edges("agent", route_after_agent, ["phase", END])
+    graph.add_edge("phase", "merge_phases")
+    graph.add_edge("merge_phases", END)
 
-    memory = MemorySaver()
+    memory = TieredCheckpointSaver(
+        path=os.getenv("CHECKPOINT_DB_PATH"),
+        max_resident_bytes=int(
+            os.getenv("CHECKPOINT_MAX_RESIDENT_BYTES", DEFAULT_MAX_RESIDENT_BYTES)
+        ),
+        idle_seconds=float(os.getenv("CHECKPOINT_IDLE_SECONDS", DEFAULT_IDLE_SECONDS)),
+    )
     return graph.compile(checkpointer=memory)
 
 
-def get_response(graph, user_input: str, thread_id: str):
-    config = {"configurable": {"thread_id": thread_id}}
+def warm_up() -> None:
+    """Load the tokenizer and LLM client (and their heavy imports) ahead of use."""
+    try:
+        get_encoding()
+        llm_client.llm
+    except Exception:
+        # e.g. missing API key or tokenizer data; surfaces on first real use instead
+        pass
+
 
-    result = graph.invoke({"messages": [HumanMessage(content=user_input)]}, config)
+@lru_cache(maxsize=1)
+def get_graph():
+    """Compiled graph shared by all sessions in the process.
 
-    return result
+    Threads are isolated by thread_id in the checkpointer, so one compiled graph
+    can serve every session. The tokenizer and LLM client are warmed in the
+    background so the first turn doesn't pay for loading them.
+    """
+    threading.Thread(target=warm_up, daemon=True).start()
+    return create_graph()
+
+
+# process-wide so every session's turns for a thread_id go through one queue
+turn_scheduler = TurnScheduler()
+
+
+def get_response(graph, user_input: str, thread_id: str):
+    config = {
+        "configurable": {"thread_id": thread_id},
+        "max_concurrency": MAX_PARALLEL_PHASES,
+    }
+
+    return turn_scheduler.run(
+        thread_id,
+        (id(graph), user_input),
+        lambda: graph.invoke({"messages": [HumanMessage(content=user_input)]}, config),
+    )
 
 
 def get_conversation_state(graph, thread_id: str) -> PlanningState | None:
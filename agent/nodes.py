@@ -6,32 +6,86 @@ from typing import Literal
 from langchain_core.messages import AIMessage
 from langchain_core.messages import HumanMessage
 from langchain_core.messages import SystemMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END
 from langgraph.graph.message import RemoveMessage
+from langgraph.types import Send
 
 from .prompts import COMPRESSION_PROMPT
+from .prompts import PHASE_PROMPT
 from .prompts import SUMMARY_PROMPT
 from .prompts import SYSTEM_PROMPT
+from .recall import recall
+from .resilience import LLMUnavailableError
+from .resilience import ResiliencePolicy
+from .resilience import ResilientLLM
 from .state import AgentResponse
+from .state import ArchivedSnippet
 from .state import get_state_value
+from .state import merge_preserved_context
+from .state import PhaseSteps
+from .state import PhaseTask
 from .state import Plan
+from .state import PlanDraft
 from .state import PlanningState
+from .state import PlanStep
 from .state import PlanVersion
 from .state import PreservedContext
 from utils.diff_generator import generate_plan_diff
 from utils.token_counter import count_tokens
+from utils.token_counter import RECALL_BUFFER
 from utils.token_counter import should_compress
 
 
 def get_llm():
+    # imported here: langchain_openai/openai dominate import time and are only
+    # needed once the first LLM call is made
+    from langchain_openai import ChatOpenAI
+
     return ChatOpenAI(
         model="gpt-oss-120b",
         base_url="https://api.cerebras.ai/v1",
         api_key=os.getenv("CEREBRAS_API_KEY"),
         temperature=0.7,
+        max_retries=0,  # retries are handled by ResilientLLM
+        # ends attempts ResilientLLM has stopped waiting for
+        timeout=LLM_POLICY.attempt_timeout + 5,
     )
 
 
+# optional fan-out path: the agent may answer with a phase outline, and each
+# phase's steps are then generated concurrently (bounded by max_concurrency)
+PARALLEL_PHASES = os.getenv("PARALLEL_PHASES", "false").lower() in ("1", "true")
+MAX_PARALLEL_PHASES = int(os.getenv("MAX_PARALLEL_PHASES", "4"))
+MAX_PHASES = 12
+
+# one shared token bucket for every LLM call. The burst holds a whole fan-out
+# (agent call plus MAX_PHASES phase calls), so max_concurrency, not the
+# limiter, paces the phases; LLM_RATE_PER_SECOND keeps the sustained rate
+# within the upstream quota
+LLM_POLICY = ResiliencePolicy(
+    rate_per_second=float(os.getenv("LLM_RATE_PER_SECOND", "2")),
+    burst=MAX_PHASES + 1 if PARALLEL_PHASES else 4,
+)
+
+PHASE_SCHEMA_INSTRUCTION = f"""
+For a large plan with several distinct phases (more than about 15 steps), return "phase_outline" instead of "plan":
+    "phase_outline": {{"title": "...", "phases": ["phase name", ...], "metadata": {{}}}}
+Use at most {MAX_PHASES} phases. Leave "plan" null in that case. The steps of each phase are written separately.
+"""
+
+# shared across threads so the rate limiter and latency stats are process-wide
+llm_client = ResilientLLM(get_llm, LLM_POLICY)
+
+
+def fold_phases(phases: list[str]) -> list[str]:
+    """Cap the outline at MAX_PHASES by merging the overflow into the last phase."""
+    if len(phases) <= MAX_PHASES:
+        return phases
+    keep = MAX_PHASES - 1
+    return phases[:keep] + ["; ".join(phases[keep:])]
+
+
 def format_plan_for_prompt(plan: Plan | None) -> str:
     if plan is None:
         return "No plan created yet."
@@ -64,6 +118,55 @@ def format_context_for_prompt(ctx: PreservedContext) -> str:
     return "\n".join(parts) if parts else "No context yet."
 
 
+def extract_json(content: str) -> dict:
+    """Parse a JSON object from a model reply, tolerating markdown code fences."""
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0]
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0]
+    return json.loads(content.strip())
+
+
+def commit_plan(
+    current_plan: Plan | None,
+    plan_versions: list[PlanVersion],
+    draft: PlanDraft,
+    undo_to: int | None = None,
+) -> tuple[Plan, list[PlanVersion], list[str]]:
+    """Turn a draft into the next plan version, archiving the current one with its diff.
+
+    `undo_to` marks the new version as an undo back to that version.
+    """
+    new_plan = Plan(
+        title=draft.title,
+        steps=draft.steps,
+        metadata=draft.metadata or {},
+        version=(current_plan.version + 1) if current_plan else 1,
+        created_at=current_plan.created_at if current_plan else datetime.now(),
+        updated_at=datetime.now(),
+    )
+    changes: list[str] = []
+    if current_plan:
+        changes = generate_plan_diff(current_plan.model_dump(), new_plan.model_dump())
+        plan_versions = plan_versions + [
+            PlanVersion(
+                plan=current_plan, change_summary="\n".join(changes), undo_to=undo_to
+            )
+        ]
+    return new_plan, plan_versions, changes
+
+
+def archive_messages(messages: list) -> list[ArchivedSnippet]:
+    """Snapshot messages about to be evicted so they stay searchable."""
+    return [
+        ArchivedSnippet(
+            role="User" if isinstance(m, HumanMessage) else "Assistant", text=m.content
+        )
+        for m in messages
+        if not isinstance(m, SystemMessage) and isinstance(m.content, str)
+    ]
+
+
 def compress_context_node(state: PlanningState) -> dict:
     messages = list(get_state_value(state, "messages"))
     preserved = get_state_value(state, "preserved_context")
@@ -81,49 +184,16 @@ def compress_context_node(state: PlanningState) -> dict:
         ]
     )
 
-    llm = get_llm()
     prompt = COMPRESSION_PROMPT.format(
         conversation=conversation_text,
         preserved_context=preserved.model_dump_json() if preserved else "{}",
     )
 
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
-        content = response.content
-
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
+        response = llm_client.invoke([HumanMessage(content=prompt)])
+        data = extract_json(response.content)
 
-        data = json.loads(content.strip())
-
-        new_preserved = PreservedContext(
-            original_requirements=data.get("original_requirements")
-            or preserved.original_requirements,
-            key_decisions=list(
-                dict.fromkeys(preserved.key_decisions + data.get("key_decisions", []))
-            ),
-            constraints=list(
-                dict.fromkeys(preserved.constraints + data.get("constraints", []))
-            ),
-            rejected_options=list(
-                dict.fromkeys(
-                    preserved.rejected_options + data.get("rejected_options", [])
-                )
-            ),
-            clarifications_given=list(
-                dict.fromkeys(
-                    preserved.clarifications_given
-                    + data.get("clarifications_given", [])
-                )
-            ),
-            important_context=list(
-                dict.fromkeys(
-                    preserved.important_context + data.get("important_context", [])
-                )
-            ),
-        )
+        new_preserved = merge_preserved_context(preserved, data)
 
         summary = data.get("summary", "Previous conversation summarized.")
         summary_msg = SystemMessage(
@@ -137,16 +207,36 @@ def compress_context_node(state: PlanningState) -> dict:
             "messages": remove_all + [summary_msg] + recent_messages,
             "preserved_context": new_preserved,
             "conversation_summary": summary,
+            "recall_archive": archive_messages(old_messages),
         }
     except Exception:
         # Fallback: remove oldest messages, keep recent 6
         if len(messages) > 6:
             remove_ops = [RemoveMessage(id=m.id) for m in messages[:-6]]
-            return {"messages": remove_ops}
+            return {
+                "messages": remove_ops,
+                "recall_archive": archive_messages(messages[:-6]),
+            }
         return {}
 
 
-def planning_agent_node(state: PlanningState) -> dict:
+def recall_for_prompt(state: PlanningState, config: RunnableConfig | None) -> str:
+    messages = get_state_value(state, "messages")
+    query = messages[-1].content if messages else ""
+    thread_id = ((config or {}).get("configurable") or {}).get("thread_id", "")
+    snippets = recall(
+        thread_id,
+        query if isinstance(query, str) else "",
+        get_state_value(state, "recall_archive"),
+        get_state_value(state, "plan_versions"),
+        token_budget=RECALL_BUFFER,
+    )
+    return "\n".join(f"- {s}" for s in snippets) if snippets else "None."
+
+
+def planning_agent_node(
+    state: PlanningState, config: RunnableConfig | None = None
+) -> dict:
     messages = get_state_value(state, "messages")
     current_plan = get_state_value(state, "current_plan")
     preserved = get_state_value(state, "preserved_context")
@@ -158,10 +248,9 @@ def planning_agent_node(state: PlanningState) -> dict:
         context=format_context_for_prompt(preserved),
         current_plan=format_plan_for_prompt(current_plan),
         conversation_summary=conversation_summary or "None yet.",
+        recalled=recall_for_prompt(state, config),
     )
 
-    llm = get_llm()
-
     schema_instruction = """
 Respond with JSON in this format:
 {
@@ -174,21 +263,25 @@ Respond with JSON in this format:
 }
 """
 
+    if PARALLEL_PHASES:
+        schema_instruction += PHASE_SCHEMA_INSTRUCTION
+
     full_messages = [
         SystemMessage(content=system_content + "\n\n" + schema_instruction)
     ] + list(messages)
 
-    response = llm.invoke(full_messages)
-    content = response.content
-
     try:
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
-
-        data = json.loads(content.strip())
-        agent_response = AgentResponse(**data)
+        response = llm_client.invoke(full_messages)
+    except LLMUnavailableError:
+        return {
+            "messages": [
+                AIMessage(
+                    content="I'm having trouble reaching the model right now. Please try again in a moment."
+                )
+            ]
+        }
+    try:
+        agent_response = AgentResponse(**extract_json(response.content))
     except Exception:
         agent_response = AgentResponse(message=response.content)
 
@@ -197,30 +290,24 @@ Respond with JSON in this format:
         questions = "\n".join([f"- {q}" for q in agent_response.clarifying_questions])
         message_content = f"{message_content}\n\n{questions}"
 
-    result: dict = {"messages": [AIMessage(content=message_content)]}
+    outline = agent_response.phase_outline
+    if PARALLEL_PHASES and outline and outline.phases and not agent_response.plan:
+        # steps are generated per phase by phase_steps_node; merge_phases_node replies
+        result: dict = {
+            "phase_outline": outline.model_copy(
+                update={
+                    "phases": fold_phases(outline.phases),
+                    "message": message_content,
+                }
+            )
+        }
+    else:
+        result = {"messages": [AIMessage(content=message_content)]}
 
     if agent_response.plan:
-        new_plan = Plan(
-            title=agent_response.plan.title,
-            steps=agent_response.plan.steps,
-            metadata=agent_response.plan.metadata or {},
-            version=(current_plan.version + 1) if current_plan else 1,
-            created_at=current_plan.created_at if current_plan else datetime.now(),
-            updated_at=datetime.now(),
+        new_plan, plan_versions, _ = commit_plan(
+            current_plan, plan_versions, agent_response.plan
         )
-        if current_plan:
-            old_dict = (
-                current_plan.model_dump()
-                if hasattr(current_plan, "model_dump")
-                else current_plan
-            )
-            new_dict = new_plan.model_dump()
-            changes = generate_plan_diff(old_dict, new_dict)
-
-            plan_versions.append(
-                PlanVersion(plan=current_plan, change_summary="\n".join(changes))
-            )
-
         result["current_plan"] = new_plan
         result["plan_versions"] = plan_versions
 
@@ -229,26 +316,115 @@ Respond with JSON in this format:
         result["user_preferences"] = user_prefs
 
     if agent_response.extracted_constraints or agent_response.extracted_decisions:
-        new_preserved = PreservedContext(
-            original_requirements=preserved.original_requirements,
-            key_decisions=list(
-                dict.fromkeys(
-                    preserved.key_decisions + agent_response.extracted_decisions
-                )
-            ),
-            constraints=list(
-                dict.fromkeys(
-                    preserved.constraints + agent_response.extracted_constraints
-                )
-            ),
-            rejected_options=list(preserved.rejected_options),
-            clarifications_given=list(preserved.clarifications_given),
-            important_context=list(preserved.important_context),
+        new_preserved = merge_preserved_context(
+            preserved,
+            {
+                "key_decisions": agent_response.extracted_decisions,
+                "constraints": agent_response.extracted_constraints,
+            },
         )
         result["preserved_context"] = new_preserved
     return result
 
 
+def route_after_agent(state: PlanningState) -> list[Send] | str:
+    """Fan out one phase_steps_node per phase when the agent returned an outline."""
+    outline = get_state_value(state, "phase_outline")
+    if not outline:
+        return END
+    messages = get_state_value(state, "messages")
+    request = messages[-1].content if messages else ""
+    context = format_context_for_prompt(get_state_value(state, "preserved_context"))
+    return [
+        Send(
+            "phase",
+            PhaseTask(
+                phase_index=i,
+                phase=phase,
+                outline=outline,
+                request=request if isinstance(request, str) else "",
+                context=context,
+            ),
+        )
+        for i, phase in enumerate(outline.phases)
+    ]
+
+
+def phase_steps_node(task: PhaseTask) -> dict:
+    outline = task["outline"]
+    prompt = PHASE_PROMPT.format(
+        title=outline.title,
+        phases="\n".join(f"{i + 1}. {p}" for i, p in enumerate(outline.phases)),
+        request=task["request"],
+        context=task["context"],
+        phase_number=task["phase_index"] + 1,
+        phase=task["phase"],
+    )
+    try:
+        response = llm_client.invoke([HumanMessage(content=prompt)])
+        data = extract_json(response.content)
+        steps = [
+            PlanStep(
+                step_number=i,
+                title=step["title"],
+                description=step.get("description", ""),
+            )
+            for i, step in enumerate(data.get("steps", []), start=1)
+        ]
+    except Exception:
+        steps = []
+    if not steps:
+        # Fallback: keep the phase as a single step so the plan stays complete
+        steps = [PlanStep(step_number=1, title=task["phase"])]
+    return {
+        "phase_results": [
+            PhaseSteps(
+                phase_index=task["phase_index"], phase=task["phase"], steps=steps
+            )
+        ]
+    }
+
+
+def merge_phases_node(state: PlanningState) -> dict:
+    """Combine per-phase steps into one plan with sequential numbering."""
+    outline = get_state_value(state, "phase_outline")
+    current_plan = get_state_value(state, "current_plan")
+    plan_versions = list(get_state_value(state, "plan_versions"))
+    results = sorted(
+        get_state_value(state, "phase_results"), key=lambda r: r.phase_index
+    )
+
+    steps: list[PlanStep] = []
+    phases = []
+    for result in results:
+        first = len(steps) + 1
+        for step in result.steps:
+            steps.append(step.model_copy(update={"step_number": len(steps) + 1}))
+        phases.append({"name": result.phase, "steps": [first, len(steps)]})
+
+    draft = PlanDraft(
+        title=outline.title,
+        steps=steps,
+        metadata={**outline.metadata, "phases": phases},
+    )
+    new_plan, plan_versions, _ = commit_plan(current_plan, plan_versions, draft)
+    summary = "\n".join(
+        (
+            f"- {p['name']} (step {p['steps'][0]})"
+            if p["steps"][0] == p["steps"][1]
+            else f"- {p['name']} (steps {p['steps'][0]}-{p['steps'][1]})"
+        )
+        for p in phases
+    )
+    return {
+        "messages": [AIMessage(content=f"{outline.message}\n\n{summary}".strip())],
+        "current_plan": new_plan,
+        "plan_versions": plan_versions,
+        "phase_outline": None,
+        "phase_results": None,
+    }
+
+
 def should_compress_check(state: PlanningState) -> Literal["compress", "agent"]:
     messages = get_state_value(state, "messages")
     plan = get_state_value(state, "current_plan")
@@ -283,6 +459,5 @@ def generate_executive_summary(state: PlanningState) -> str:
         recent_messages=recent_text,
     )
 
-    llm = get_llm()
-    response = llm.invoke([HumanMessage(content=prompt)])
+    response = llm_client.invoke([HumanMessage(content=prompt)])
     return response.content
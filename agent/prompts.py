@@ -20,6 +20,9 @@ Current context:
 Previous conversation summary:
 {conversation_summary}
 
+Recalled details from earlier in the conversation:
+{recalled}
+
 Current plan:
 {current_plan}
 """
@@ -62,3 +65,21 @@ Include:
 - Current plan status
 - Any open questions or next steps
 """
+
+PHASE_PROMPT = """You are writing the steps for one phase of a larger plan. Other phases are written separately, so only cover this phase.
+
+Plan: {title}
+
+All phases:
+{phases}
+
+User request:
+{request}
+
+Current context:
+{context}
+
+Write the steps for phase {phase_number}: {phase}
+
+Return as JSON: {{"steps": [{{"title": "...", "description": "..."}}]}}
+"""
@@ -0,0 +1,208 @@
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from collections import OrderedDict
+from collections.abc import Callable
+
+from .state import ArchivedSnippet
+from .state import PlanVersion
+from utils.token_counter import count_tokens
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9$%.\-]*[a-z0-9%]|[a-z0-9]")
+STOPWORDS = set(
+    "a an and are as at be but by for from has have i if in into is it its me my "
+    "of on or our so that the their them then there these they this to was we "
+    "were what when which will with you your can do does should would could".split()
+)
+CHUNK_WORDS = 80
+MAX_CACHED_THREADS = 256
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[list[str]], list[list[float]]]
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def chunk_text(text: str, size: int = CHUNK_WORDS) -> list[str]:
+    """Split long text into overlapping word windows so hits stay specific."""
+    words = text.split()
+    if len(words) <= size:
+        return [text]
+    step = size * 3 // 4
+    starts = range(0, len(words) - size // 4, step)
+    return [" ".join(words[start:][:size]) for start in starts]
+
+
+def load_local_embedder() -> Embedder | None:
+    """Load a local sentence-transformers model if RECALL_EMBEDDING_MODEL is set.
+
+    Returns None (plain BM25) if it is unset or the model can't be loaded.
+    """
+    model_name = os.getenv("RECALL_EMBEDDING_MODEL")
+    if not model_name:
+        return None
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(model_name)
+    except Exception:
+        logger.warning(
+            "Could not load embedding model %r, recall uses BM25 only",
+            model_name,
+            exc_info=True,
+        )
+        return None
+    return lambda texts: model.encode(texts, normalize_embeddings=True).tolist()
+
+
+class RecallIndex:
+    """BM25 inverted index over archived snippets, with optional embedding re-rank."""
+
+    def __init__(
+        self, embedder: Embedder | None = None, k1: float = 1.5, b: float = 0.75
+    ):
+        self.k1 = k1
+        self.b = b
+        self.embedder = embedder
+        self.docs: list[str] = []
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        self.doc_lengths: list[int] = []
+        self.vectors: list[list[float]] = []
+        self.n_snippets = 0
+        self.n_plan_versions = 0
+        self._total_length = 0
+
+    def add(self, text: str) -> None:
+        for chunk in chunk_text(text):
+            doc_id = len(self.docs)
+            terms = Counter(tokenize(chunk))
+            for term, tf in terms.items():
+                self.postings.setdefault(term, []).append((doc_id, tf))
+            length = sum(terms.values())
+            self.docs.append(chunk)
+            self.doc_lengths.append(length)
+            self._total_length += length
+            if self.embedder:
+                self.vectors.append(self.embedder([chunk])[0])
+
+    def sync(
+        self, snippets: list[ArchivedSnippet], plan_versions: list[PlanVersion]
+    ) -> None:
+        """Index anything appended to the archive since the last sync."""
+        seen_snippets, seen_versions = self.n_snippets, self.n_plan_versions
+        for snippet in snippets[seen_snippets:]:
+            prefix = f"{snippet.role}: " if snippet.role else ""
+            self.add(prefix + snippet.text)
+        for pv in plan_versions[seen_versions:]:
+            self.add(format_plan_version(pv))
+        self.n_snippets = len(snippets)
+        self.n_plan_versions = len(plan_versions)
+
+    def search(self, query: str, k: int = 5) -> list[tuple[float, str]]:
+        if not self.docs:
+            return []
+        n_docs = len(self.docs)
+        avg_length = self._total_length / n_docs or 1.0
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings:
+                norm = tf + self.k1 * (
+                    1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length
+                )
+                scores[doc_id] = (
+                    scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+                )
+
+        if self.embedder and self.vectors:
+            query_vec = self.embedder([query])[0]
+            top_bm25 = max(scores.values(), default=0.0) or 1.0
+            for doc_id, vec in enumerate(self.vectors):
+                cosine = sum(a * b for a, b in zip(query_vec, vec))
+                scores[doc_id] = 0.5 * scores.get(doc_id, 0.0) / top_bm25 + 0.5 * cosine
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(score, self.docs[doc_id]) for doc_id, score in ranked if score > 0]
+
+    def retrieve(self, query: str, token_budget: int, k: int = 5) -> list[str]:
+        """Top-k snippets for the query that fit within token_budget."""
+        selected = []
+        used = 0
+        for _, text in self.search(query, k):
+            tokens = count_tokens(text)
+            if used + tokens > token_budget:
+                continue
+            selected.append(text)
+            used += tokens
+        return selected
+
+
+def format_plan_version(pv: PlanVersion) -> str:
+    plan = pv.plan
+    steps = "; ".join(f"{s.step_number}. {s.title}" for s in plan.steps)
+    return f"Plan v{plan.version} '{plan.title}': {steps}"
+
+
+_indexes: OrderedDict[str, RecallIndex] = OrderedDict()
+_indexes_lock = threading.Lock()
+_embedder: Embedder | None = None
+_embedder_loaded = False
+_embedder_lock = threading.Lock()
+
+
+def get_embedder() -> Embedder | None:
+    """Load the optional embedder once per process, even if loading fails."""
+    global _embedder, _embedder_loaded
+    if not _embedder_loaded:
+        with _embedder_lock:
+            if not _embedder_loaded:
+                _embedder = load_local_embedder()
+                _embedder_loaded = True
+    return _embedder
+
+
+def get_index(thread_id: str) -> RecallIndex:
+    """Per-thread index cache. Indexes are rebuilt from state if evicted."""
+    embedder = get_embedder()  # outside _indexes_lock: loading a model is slow
+    with _indexes_lock:
+        index = _indexes.get(thread_id)
+        if index is None:
+            index = _indexes[thread_id] = RecallIndex(embedder=embedder)
+        _indexes.move_to_end(thread_id)
+        while len(_indexes) > MAX_CACHED_THREADS:
+            _indexes.popitem(last=False)
+        return index
+
+
+def drop_index(thread_id: str) -> None:
+    with _indexes_lock:
+        _indexes.pop(thread_id, None)
+
+
+def recall(
+    thread_id: str,
+    query: str,
+    snippets: list[ArchivedSnippet],
+    plan_versions: list[PlanVersion],
+    token_budget: int,
+    k: int = 5,
+) -> list[str]:
+    """Retrieve relevant archived details for a thread within a token budget."""
+    if not query or not (snippets or plan_versions):
+        return []
+    index = get_index(thread_id)
+    if index.n_snippets > len(snippets) or index.n_plan_versions > len(plan_versions):
+        # state was rewound (e.g. a fork from an older checkpoint); start over
+        drop_index(thread_id)
+        index = get_index(thread_id)
+    index.sync(snippets, plan_versions)
+    return index.retrieve(query, token_budget, k)
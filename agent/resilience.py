@@ -0,0 +1,246 @@
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import wait
+from typing import Any
+
+from pydantic import BaseModel
+
+TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMUnavailableError(Exception):
+    """Raised when an LLM call fails after exhausting the retry policy."""
+
+
+class ResiliencePolicy(BaseModel):
+    call_timeout: float = 60.0  # deadline per call, covers retries and hedges
+    attempt_timeout: float = 30.0
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    rate_per_second: float = 2.0
+    burst: int = 4
+    hedge: bool = False
+    hedge_min_samples: int = 20
+    hedge_min_delay: float = 0.5
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Check if an error is worth retrying."""
+    from openai import APIConnectionError
+    from openai import APIStatusError
+
+    if isinstance(exc, (TimeoutError, ConnectionError, APIConnectionError)):
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code in TRANSIENT_STATUS_CODES
+    return getattr(exc, "status_code", None) in TRANSIENT_STATUS_CODES
+
+
+class TokenBucket:
+    """Thread-safe client-side rate limiter."""
+
+    def __init__(self, rate: float, capacity: int, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """Take a token if available. Returns 0 on success, else seconds to wait."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout: float | None = None, sleep=time.sleep) -> bool:
+        """Block until a token is available or the timeout runs out."""
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            wait_for = self.try_acquire()
+            if wait_for == 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    return False
+                wait_for = min(wait_for, remaining)
+            sleep(wait_for)
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        idx = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[idx]
+
+
+class ResilientLLM:
+    """Wrap a chat model with deadlines, retries, rate limiting and hedging.
+
+    `llm_factory` returns any object with an `invoke(messages)` method, so a
+    local stub that injects latency and errors can stand in for the real model.
+    Each attempt runs in its own daemon thread, so attempts that miss their
+    deadline can't starve later ones; their results are discarded. The model
+    should carry its own request timeout so abandoned attempts end.
+    """
+
+    def __init__(
+        self,
+        llm_factory: Callable[[], Any],
+        policy: ResiliencePolicy | None = None,
+        sleep=time.sleep,
+        clock=time.monotonic,
+    ):
+        self.policy = policy or ResiliencePolicy()
+        self._llm_factory = llm_factory
+        self._llm = None
+        self._llm_lock = threading.Lock()
+        self._sleep = sleep
+        self._clock = clock
+        self.bucket = TokenBucket(
+            self.policy.rate_per_second, self.policy.burst, clock=clock
+        )
+        self.latency = LatencyTracker()
+        self.stats = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0}
+        self._stats_lock = threading.Lock()
+
+    def _bump(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            with self._llm_lock:
+                if self._llm is None:
+                    self._llm = self._llm_factory()
+        return self._llm
+
+    def hedge_delay(self) -> float | None:
+        """Delay before sending a duplicate request, based on observed p95."""
+        if not self.policy.hedge or len(self.latency) < self.policy.hedge_min_samples:
+            return None
+        p95 = self.latency.percentile(95)
+        return max(p95 or 0.0, self.policy.hedge_min_delay)
+
+    def _timed_invoke(self, messages: list, future: Future) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        start = self._clock()
+        try:
+            response = self.llm.invoke(messages)
+        except BaseException as exc:
+            future.set_exception(exc)
+        else:
+            self.latency.record(self._clock() - start)
+            future.set_result(response)
+
+    def _submit(self, messages: list, deadline: float) -> Future:
+        if not self.bucket.acquire(
+            timeout=max(0.0, deadline - self._clock()), sleep=self._sleep
+        ):
+            raise TimeoutError("Rate limiter wait exceeded call deadline")
+        future: Future = Future()
+        threading.Thread(
+            target=self._timed_invoke, args=(messages, future), name="llm", daemon=True
+        ).start()
+        return future
+
+    def _attempt(self, messages: list, deadline: float) -> Any:
+        attempt_deadline = min(deadline, self._clock() + self.policy.attempt_timeout)
+        futures = [self._submit(messages, deadline)]
+
+        delay = self.hedge_delay()
+        if delay is not None:
+            done, _ = wait(
+                futures, timeout=min(delay, max(0.0, attempt_deadline - self._clock()))
+            )
+            if not done and self._clock() < attempt_deadline:
+                try:
+                    futures.append(self._submit(messages, attempt_deadline))
+                    self._bump("hedges")
+                except TimeoutError:
+                    pass
+
+        pending = set(futures)
+        error: BaseException | None = None
+        while pending:
+            remaining = attempt_deadline - self._clock()
+            if remaining <= 0:
+                break
+            done, pending = wait(
+                pending, timeout=remaining, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        self._bump("hedge_wins")
+                    return future.result()
+                error = future.exception()
+
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError(f"LLM call exceeded {self.policy.attempt_timeout}s")
+
+    def invoke(self, messages: list) -> Any:
+        """Invoke the model, retrying transient errors until the call deadline."""
+        self._bump("calls")
+        deadline = self._clock() + self.policy.call_timeout
+        last_error: BaseException | None = None
+
+        for attempt in range(self.policy.max_retries + 1):
+            if attempt:
+                self._bump("retries")
+                backoff = min(
+                    self.policy.backoff_max,
+                    self.policy.backoff_base * 2 ** (attempt - 1),
+                )
+                backoff = random.uniform(0, backoff)  # full jitter
+                if self._clock() + backoff >= deadline:
+                    break
+                self._sleep(backoff)
+            try:
+                return self._attempt(messages, deadline)
+            except Exception as exc:
+                last_error = exc
+                if not is_transient_error(exc):
+                    raise
+            if self._clock() >= deadline:
+                break
+
+        raise LLMUnavailableError(
+            f"LLM call failed after {attempt + 1} attempt(s): {last_error}"
+        ) from last_error
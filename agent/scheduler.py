@@ -0,0 +1,116 @@
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Hashable
+from concurrent.futures import Future
+from typing import Any
+
+
+class _ThreadQueue:
+    def __init__(self, lock: threading.Lock):
+        self.turn = threading.Condition(lock)
+        self.next_ticket = 0
+        self.serving = 0
+        self.waiting = 0
+        self.running = False
+        self.last_key: Hashable | None = None
+        self.last_future: Future | None = None
+
+
+class TurnScheduler:
+    """Serialize turns per thread_id in submission order and coalesce duplicates.
+
+    Turns for different threads run in parallel in their callers' threads. A
+    submission with the same key as the thread's most recent one, while that
+    is still queued or running, waits for and shares its result instead of
+    running again.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._queues: dict[str, _ThreadQueue] = {}
+        self._stats = {
+            "turns": 0,
+            "coalesced": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def _enqueue(
+        self, thread_id: str, key: Hashable
+    ) -> tuple[_ThreadQueue, Future, int | None]:
+        """Take a ticket for a new turn, or return the future to share (ticket None)."""
+        with self._lock:
+            queue = self._queues.get(thread_id)
+            if queue is None:
+                queue = self._queues[thread_id] = _ThreadQueue(self._lock)
+            last = queue.last_future
+            if last is not None and queue.last_key == key and not last.done():
+                self._stats["coalesced"] += 1
+                return queue, last, None
+            future: Future = Future()
+            queue.last_key, queue.last_future = key, future
+            ticket = queue.next_ticket
+            queue.next_ticket += 1
+            queue.waiting += 1
+            return queue, future, ticket
+
+    def run(self, thread_id: str, key: Hashable, fn: Callable[[], Any]) -> Any:
+        queue, future, ticket = self._enqueue(thread_id, key)
+        if ticket is None:
+            return future.result()
+
+        start = self._clock()
+        with self._lock:
+            while queue.serving != ticket:
+                queue.turn.wait()
+            waited = self._clock() - start
+            queue.waiting -= 1
+            queue.running = True
+            self._stats["turns"] += 1
+            self._stats["total_wait_seconds"] += waited
+            self._stats["max_wait_seconds"] = max(
+                self._stats["max_wait_seconds"], waited
+            )
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                queue.running = False
+                queue.serving += 1
+                if queue.last_future is future:
+                    queue.last_key = queue.last_future = None
+                if queue.serving == queue.next_ticket:
+                    self._queues.pop(thread_id, None)
+                else:
+                    queue.turn.notify_all()
+
+    def queue_depth(self, thread_id: str | None = None) -> int:
+        """Turns waiting to run, for one thread or across all threads."""
+        with self._lock:
+            if thread_id is not None:
+                queue = self._queues.get(thread_id)
+                return queue.waiting if queue else 0
+            return sum(queue.waiting for queue in self._queues.values())
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            turns = self._stats["turns"]
+            return {
+                "queued": sum(q.waiting for q in self._queues.values()),
+                "running": sum(q.running for q in self._queues.values()),
+                "active_threads": len(self._queues),
+                "turns": turns,
+                "coalesced": self._stats["coalesced"],
+                "avg_wait_seconds": (
+                    self._stats["total_wait_seconds"] / turns if turns else 0.0
+                ),
+                "max_wait_seconds": self._stats["max_wait_seconds"],
+            }
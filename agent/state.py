@@ -1,3 +1,4 @@
+import operator
 from datetime import datetime
 from typing import Annotated
 from typing import Any
@@ -11,11 +12,14 @@ from pydantic import Field
 from typing_extensions import TypedDict
 
 
+StepStatus = Literal["pending", "in_progress", "completed"]
+
+
 class PlanStep(BaseModel):
     step_number: int
     title: str
     description: str = ""
-    status: Literal["pending", "in_progress", "completed"] = "pending"
+    status: StepStatus = "pending"
 
 
 class PlanDraft(BaseModel):
@@ -33,10 +37,34 @@ class Plan(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.now)
 
 
+class PhaseOutline(BaseModel):
+    title: str
+    phases: list[str] = Field(default_factory=list)
+    metadata: dict = Field(default_factory=dict)
+    message: str = ""
+
+
+class PhaseSteps(BaseModel):
+    phase_index: int
+    phase: str
+    steps: list[PlanStep] = Field(default_factory=list)
+
+
+def collect_phase_results(
+    existing: list[PhaseSteps] | None, new: list[PhaseSteps] | None
+) -> list[PhaseSteps]:
+    """Accumulate fan-out results; a None update clears them after merging."""
+    if new is None:
+        return []
+    return (existing or []) + new
+
+
 class PlanVersion(BaseModel):
     plan: Plan
     timestamp: datetime = Field(default_factory=datetime.now)
     change_summary: str = ""
+    # set when the plan after this one was an undo back to version `undo_to`
+    undo_to: int | None = None
 
 
 class PreservedContext(BaseModel):
@@ -48,6 +76,43 @@ class PreservedContext(BaseModel):
     important_context: list[str] = Field(default_factory=list)
 
 
+class ArchivedSnippet(BaseModel):
+    """Message text removed from the live history, kept for recall."""
+
+    role: str = ""
+    text: str
+
+
+PRESERVED_LIST_FIELDS = (
+    "key_decisions",
+    "constraints",
+    "rejected_options",
+    "clarifications_given",
+    "important_context",
+)
+
+
+def merge_preserved_context(
+    preserved: PreservedContext, updates: dict[str, Any]
+) -> PreservedContext:
+    """Merge extracted details into preserved context, deduplicating list fields.
+
+    Raises TypeError if a list field in `updates` is not a list or tuple, so a
+    malformed LLM reply is rejected rather than merged.
+    """
+    merged = {}
+    for field in PRESERVED_LIST_FIELDS:
+        values = updates.get(field, [])
+        if not isinstance(values, (list, tuple)):
+            raise TypeError(f"{field} must be a list, got {type(values).__name__}")
+        merged[field] = list(dict.fromkeys(getattr(preserved, field) + list(values)))
+    return PreservedContext(
+        original_requirements=updates.get("original_requirements")
+        or preserved.original_requirements,
+        **merged,
+    )
+
+
 class PlanningState(TypedDict):
     messages: Annotated[list[BaseMessage], add_messages]
     current_plan: NotRequired[Plan | None]
@@ -55,6 +120,9 @@ class PlanningState(TypedDict):
     user_preferences: NotRequired[dict[str, Any]]
     conversation_summary: NotRequired[str]
     preserved_context: NotRequired[PreservedContext]
+    recall_archive: NotRequired[Annotated[list[ArchivedSnippet], operator.add]]
+    phase_outline: NotRequired[PhaseOutline | None]
+    phase_results: NotRequired[Annotated[list[PhaseSteps], collect_phase_results]]
 
 
 STATE_DEFAULTS: dict[str, Any] = {
@@ -63,6 +131,9 @@ STATE_DEFAULTS: dict[str, Any] = {
     "user_preferences": {},
     "conversation_summary": "",
     "preserved_context": PreservedContext(),
+    "recall_archive": [],
+    "phase_outline": None,
+    "phase_results": [],
 }
 
 
@@ -86,9 +157,18 @@ def get_state_value(state: PlanningState, key: str) -> Any:
     return value
 
 
+class PhaseTask(TypedDict):
+    phase_index: int
+    phase: str
+    outline: PhaseOutline
+    request: str
+    context: str
+
+
 class AgentResponse(BaseModel):
     message: str
     plan: PlanDraft | None = None
+    phase_outline: PhaseOutline | None = None
     clarifying_questions: list[str] = Field(default_factory=list)
     extracted_preferences: dict[str, Any] = Field(default_factory=dict)
     extracted_constraints: list[str] = Field(default_factory=list)
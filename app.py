@@ -3,8 +3,8 @@ import uuid
 import streamlit as st
 from dotenv import load_dotenv
 
-from agent.graph import create_graph
 from agent.graph import get_conversation_state
+from agent.graph import get_graph
 from agent.graph import get_response
 from agent.nodes import generate_executive_summary
 from agent.state import Plan
@@ -20,7 +20,7 @@ def init_session():
     if "thread_id" not in st.session_state:
         st.session_state.thread_id = str(uuid.uuid4())
     if "graph" not in st.session_state:
-        st.session_state.graph = create_graph()
+        st.session_state.graph = get_graph()
     if "messages" not in st.session_state:
         st.session_state.messages = []
     if "current_plan" not in st.session_state:
@@ -0,0 +1,99 @@
+# Cold-start budget check: import time, graph build and time to first response.
+#
+# Each measurement runs in a fresh interpreter so module caches don't hide costs.
+# The first turn uses a local echo model, so it measures the app's own overhead
+# (graph, checkpointer, tokenizer, prompt building) without network latency.
+#
+# Usage:
+#     python -m benchmarks.cold_start
+#     python -m benchmarks.cold_start --runs 5 --import-budget-ms 1200
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+from agent.graph import get_graph, get_response, warm_up
+t1 = time.perf_counter()
+graph = get_graph()
+t2 = time.perf_counter()
+warm_up()
+t3 = time.perf_counter()
+
+from langchain_core.messages import AIMessage
+from agent.nodes import llm_client
+
+
+class EchoModel:
+    def invoke(self, messages):
+        return AIMessage(content=json.dumps({"message": "ok"}))
+
+
+llm_client._llm = EchoModel()
+t4 = time.perf_counter()
+get_response(graph, "Plan a team offsite", "cold-start")
+t5 = time.perf_counter()
+print(json.dumps({
+    "import": t1 - t0,
+    "graph_build": t2 - t1,
+    "warm_up": t3 - t2,
+    "first_turn": t5 - t4,
+    "total": (t3 - t0) + (t5 - t4),
+}))
+"""
+
+
+def probe() -> dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Cold-start budget check: import time, graph build and time to first response"
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--import-budget-ms", type=float, default=1500)
+    parser.add_argument("--graph-budget-ms", type=float, default=100)
+    parser.add_argument("--warm-up-budget-ms", type=float, default=2000)
+    parser.add_argument("--first-turn-budget-ms", type=float, default=250)
+    args = parser.parse_args(argv)
+
+    budgets = {
+        "import": args.import_budget_ms,
+        "graph_build": args.graph_budget_ms,
+        "warm_up": args.warm_up_budget_ms,
+        "first_turn": args.first_turn_budget_ms,
+    }
+    runs = [probe() for _ in range(args.runs)]
+
+    over = []
+    print(f"{'phase':<12} {'median':>10} {'budget':>10}")
+    for phase in (*budgets, "total"):
+        median = statistics.median(run[phase] for run in runs) * 1000
+        budget = budgets.get(phase)
+        budget_text = f"{budget:.0f} ms" if budget else "-"
+        print(f"{phase:<12} {median:>7.0f} ms {budget_text:>10}")
+        if budget and median > budget:
+            over.append(phase)
+
+    if over:
+        print(f"\nOver budget: {', '.join(over)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import random
+from typing import Literal
+
+from langchain_core.messages import AIMessage
+from langchain_core.messages import BaseMessage
+from langchain_core.messages import HumanMessage
+
+from agent.state import Plan
+from agent.state import PlanStep
+from agent.state import PRESERVED_LIST_FIELDS
+from agent.state import PreservedContext
+
+WORDS = (
+    "launch budget vendor timeline review design deploy audit hire train "
+    "market survey draft approve schedule venue catering signage budget "
+    "contract pricing onboarding feedback metrics rollout support docs"
+).split()
+
+STATUSES: tuple[Literal["pending", "in_progress", "completed"], ...] = (
+    "pending",
+    "in_progress",
+    "completed",
+)
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n_words)).capitalize() + "."
+
+
+def make_plan(n_steps: int, seed: int = 0, version: int = 1) -> Plan:
+    """Build a plan with n_steps steps of realistic length."""
+    rng = random.Random(seed)
+    steps = [
+        PlanStep(
+            step_number=i,
+            title=_sentence(rng, rng.randint(3, 8)),
+            description=_sentence(rng, rng.randint(8, 25)),
+            status=rng.choice(STATUSES),
+        )
+        for i in range(1, n_steps + 1)
+    ]
+    return Plan(title=f"Plan with {n_steps} steps", steps=steps, version=version)
+
+
+def mutate_plan(plan: Plan, seed: int = 1, fraction: float = 0.1) -> Plan:
+    """Copy a plan with a fraction of steps renamed, re-described, added or removed."""
+    rng = random.Random(seed)
+    steps = [step.model_copy() for step in plan.steps]
+    for step in rng.sample(steps, max(1, int(len(steps) * fraction))):
+        choice = rng.random()
+        if choice < 0.4:
+            step.title = _sentence(rng, 5)
+        elif choice < 0.7:
+            step.description = _sentence(rng, 12)
+        else:
+            step.status = rng.choice(STATUSES)
+    removed = max(1, int(len(steps) * fraction / 4))
+    steps = steps[:-removed] if len(steps) > removed else steps
+    start = len(plan.steps) + 1
+    steps += [
+        PlanStep(step_number=start + i, title=_sentence(rng, 4))
+        for i in range(removed * 2)
+    ]
+    return plan.model_copy(update={"steps": steps, "version": plan.version + 1})
+
+
+def make_messages(n_messages: int, seed: int = 0) -> list[BaseMessage]:
+    """Alternating user/assistant history; assistant turns are longer."""
+    rng = random.Random(seed)
+    messages: list[BaseMessage] = []
+    for i in range(n_messages):
+        if i % 2 == 0:
+            messages.append(HumanMessage(content=_sentence(rng, rng.randint(8, 40))))
+        else:
+            content = " ".join(_sentence(rng, 15) for _ in range(rng.randint(3, 12)))
+            messages.append(AIMessage(content=content))
+    return messages
+
+
+def make_preserved_context(n_items: int, seed: int = 0) -> PreservedContext:
+    """Preserved context with n_items entries in each list field."""
+    rng = random.Random(seed)
+
+    def items(prefix: str) -> list[str]:
+        return [f"{prefix} {i}: {_sentence(rng, 6)}" for i in range(n_items)]
+
+    return PreservedContext(
+        original_requirements=_sentence(rng, 30),
+        key_decisions=items("decision"),
+        constraints=items("constraint"),
+        rejected_options=items("rejected"),
+        clarifications_given=items("clarification"),
+        important_context=items("context"),
+    )
+
+
+def make_context_updates(n_items: int, overlap: float = 0.5, seed: int = 1) -> dict:
+    """Extraction payload where `overlap` of the entries already exist."""
+    existing = make_preserved_context(n_items, seed=0)
+    fresh = make_preserved_context(n_items, seed=seed)
+    cut = int(n_items * overlap)
+    updates = {}
+    for field in PRESERVED_LIST_FIELDS:
+        old = getattr(existing, field)[:cut]
+        new = [f"new {item}" for item in getattr(fresh, field)[cut:]]
+        updates[field] = old + new
+    return updates
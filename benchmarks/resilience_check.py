@@ -0,0 +1,171 @@
+# Resilience check: retry, deadline, hedging and recovery against a local stub.
+#
+# StubModel stands in for the chat model and injects latency, transient errors
+# and stalls, so ResilientLLM's policy can be exercised without network access.
+#
+# Usage:
+#     python -m benchmarks.resilience_check
+import sys
+import threading
+import time
+from collections.abc import Callable
+
+from langchain_core.messages import AIMessage
+
+from agent.resilience import LLMUnavailableError
+from agent.resilience import ResiliencePolicy
+from agent.resilience import ResilientLLM
+
+
+class StubError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"stub error {status_code}")
+        self.status_code = status_code
+
+
+class StubModel:
+    """Chat model stand-in. Each call pops the next behaviour from `script`.
+
+    A behaviour is a latency in seconds, an HTTP status code to fail with
+    (given as a string, e.g. "503"), or "stall" to hang until `release()` is
+    called or `timeout` runs out, like a request stuck on a dead connection.
+    When the script is empty, calls answer after `latency` seconds.
+    """
+
+    def __init__(
+        self,
+        script: list[float | str] | None = None,
+        latency: float = 0.01,
+        timeout: float = 2.0,
+    ):
+        self.script = list(script or [])
+        self.latency = latency
+        self.timeout = timeout
+        self.calls = 0
+        self._released = threading.Event()
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        self._released.set()
+
+    def invoke(self, messages: list) -> AIMessage:
+        with self._lock:
+            self.calls += 1
+            behaviour = self.script.pop(0) if self.script else self.latency
+        if behaviour == "stall":
+            if not self._released.wait(self.timeout):
+                raise TimeoutError("stub request timed out")
+            raise ConnectionError("stub connection dropped")
+        if isinstance(behaviour, str):
+            raise StubError(int(behaviour))
+        time.sleep(behaviour)
+        return AIMessage(content="ok")
+
+
+def make_client(model: StubModel, **policy) -> ResilientLLM:
+    policy = {"backoff_base": 0.01, "rate_per_second": 1000, "burst": 100, **policy}
+    return ResilientLLM(lambda: model, ResiliencePolicy(**policy))
+
+
+def check_retry() -> str:
+    model = StubModel(["503", "429"])
+    client = make_client(model)
+    assert client.invoke([]).content == "ok"
+    assert client.stats["retries"] == 2, client.stats
+    return f"{model.calls} calls, {client.stats['retries']} retries"
+
+
+def check_non_transient() -> str:
+    model = StubModel(["400"])
+    client = make_client(model)
+    try:
+        client.invoke([])
+    except StubError:
+        pass
+    else:
+        raise AssertionError("non-transient error was swallowed")
+    assert model.calls == 1, model.calls
+    return "raised after 1 call"
+
+
+def check_deadline() -> str:
+    model = StubModel(["stall"] * 10)
+    client = make_client(model, call_timeout=0.5, attempt_timeout=0.2)
+    start = time.monotonic()
+    try:
+        client.invoke([])
+    except LLMUnavailableError:
+        pass
+    else:
+        raise AssertionError("stalled call did not fail")
+    elapsed = time.monotonic() - start
+    model.release()
+    assert elapsed < 0.8, elapsed
+    return f"gave up after {elapsed * 1000:.0f} ms"
+
+
+def check_hedge() -> str:
+    model = StubModel(latency=0.01)
+    client = make_client(model, hedge=True, hedge_min_samples=5, hedge_min_delay=0.05)
+    for _ in range(5):
+        client.invoke([])
+    model.script = [1.0]  # the next request is slow, its hedge is not
+    start = time.monotonic()
+    client.invoke([])
+    elapsed = time.monotonic() - start
+    assert client.stats["hedge_wins"] == 1, client.stats
+    assert elapsed < 0.5, elapsed
+    return f"hedge won in {elapsed * 1000:.0f} ms"
+
+
+def check_recovery_after_stalls() -> str:
+    stalled = 32
+    model = StubModel(["stall"] * stalled, timeout=5.0)
+    client = make_client(model, call_timeout=1.0, attempt_timeout=0.2, max_retries=0)
+    threads = [
+        threading.Thread(target=_swallow, args=(client.invoke, LLMUnavailableError))
+        for _ in range(stalled)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # the stalled requests are still hanging; the upstream is healthy again
+    assert client.invoke([]).content == "ok"
+    model.release()
+    return f"answered with {stalled} requests still stalled"
+
+
+def _swallow(fn: Callable, error: type[BaseException]) -> None:
+    try:
+        fn([])
+    except error:
+        pass
+
+
+CHECKS = {
+    "retry": check_retry,
+    "non_transient": check_non_transient,
+    "deadline": check_deadline,
+    "hedge": check_hedge,
+    "recovery": check_recovery_after_stalls,
+}
+
+
+def main() -> int:
+    failed = []
+    for name, check in CHECKS.items():
+        try:
+            detail = check()
+        except Exception as exc:
+            failed.append(name)
+            detail = f"FAILED: {exc!r}"
+        print(f"{name:<14} {detail}")
+    if failed:
+        print(f"\nFailed: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# Microbenchmarks for the pure-Python code that runs on every turn.
+#
+# Usage:
+#     python -m benchmarks.run                      # run and print results
+#     python -m benchmarks.run --filter plan_diff   # only matching cases
+#     python -m benchmarks.run --save-baseline      # write benchmarks/baseline.json
+#     python -m benchmarks.run --compare            # fail on regressions vs baseline
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+
+from .fixtures import make_context_updates
+from .fixtures import make_messages
+from .fixtures import make_plan
+from .fixtures import make_preserved_context
+from .fixtures import mutate_plan
+from agent.nodes import format_context_for_prompt
+from agent.nodes import format_plan_for_prompt
+from agent.state import get_state_value
+from agent.state import merge_preserved_context
+from agent.state import PlanningState
+from utils.diff_generator import generate_plan_diff
+from utils.token_counter import count_tokens
+from utils.token_counter import estimate_tokens
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+PLAN_SIZES = (10, 100, 1000, 5000)
+HISTORY_SIZES = (10, 100, 500, 2000)
+CONTEXT_SIZES = (10, 100, 1000)
+
+
+def read_state_fields(state: PlanningState) -> list:
+    """The state reads a turn does, as one case."""
+    return [
+        get_state_value(state, key)
+        for key in (
+            "messages",
+            "current_plan",
+            "plan_versions",
+            "user_preferences",
+            "conversation_summary",
+            "preserved_context",
+        )
+    ]
+
+
+def build_cases() -> dict[str, Callable[[], object]]:
+    """Map case name -> zero-arg callable. Fixtures are built up front."""
+    cases: dict[str, Callable[[], object]] = {}
+
+    for n in PLAN_SIZES:
+        plan = make_plan(n)
+        text = format_plan_for_prompt(plan)
+        old, new = plan.model_dump(), mutate_plan(plan).model_dump()
+        cases[f"format_plan_for_prompt[{n}]"] = partial(format_plan_for_prompt, plan)
+        cases[f"count_tokens[plan={n}]"] = partial(count_tokens, text)
+        cases[f"generate_plan_diff[{n}]"] = partial(generate_plan_diff, old, new)
+
+    for n in HISTORY_SIZES:
+        messages = make_messages(n)
+        state = PlanningState(messages=messages, current_plan=make_plan(10))
+        cases[f"estimate_tokens[{n}]"] = partial(estimate_tokens, messages)
+        cases[f"get_state_value[{n}]"] = partial(read_state_fields, state)
+
+    for n in CONTEXT_SIZES:
+        ctx = make_preserved_context(n)
+        updates = make_context_updates(n)
+        cases[f"format_context_for_prompt[{n}]"] = partial(
+            format_context_for_prompt, ctx
+        )
+        cases[f"merge_preserved_context[{n}]"] = partial(
+            merge_preserved_context, ctx, updates
+        )
+
+    return cases
+
+
+def measure(fn: Callable[[], object], min_time: float = 0.2, repeat: int = 5) -> dict:
+    """Best-of-`repeat` mean time per call, plus peak memory of a single call."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or number >= 1_000_000:
+            break
+        number *= 2
+
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            timings.append((time.perf_counter() - start) / number)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": min(timings), "peak_bytes": peak, "loops": number}
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def format_bytes(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return a line per case slower (or hungrier) than baseline by > tolerance."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        for key, label in (("seconds", "time"), ("peak_bytes", "memory")):
+            if base[key] and result[key] > base[key] * (1 + tolerance):
+                ratio = result[key] / base[key]
+                regressions.append(f"{name}: {label} {ratio:.2f}x baseline")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Microbenchmarks for the pure-Python code that runs on every turn"
+    )
+    parser.add_argument("--filter", default="", help="substring to select cases")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed slowdown before a case counts as a regression (0.25 = 25%%)",
+    )
+    args = parser.parse_args(argv)
+
+    cases = {name: fn for name, fn in build_cases().items() if args.filter in name}
+    results = {}
+    print(f"{'case':<36} {'time/op':>12} {'peak mem':>10}")
+    for name, fn in cases.items():
+        results[name] = measure(fn, min_time=args.min_time, repeat=args.repeat)
+        print(
+            f"{name:<36} {format_seconds(results[name]['seconds']):>12} "
+            f"{format_bytes(results[name]['peak_bytes']):>10}"
+        )
+
+    if args.save_baseline:
+        payload = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+
+    if args.compare:
+        if not args.baseline.exists():
+            print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+            return 1
+        regressions = compare(
+            results, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,14 @@
-import tiktoken
+from functools import lru_cache
+
 from langchain_core.messages import BaseMessage
 
-ENCODING = tiktoken.get_encoding("cl100k_base")
+ENCODING_NAME = "cl100k_base"
 
 # token budget constants
 SYSTEM_PROMPT_BUFFER = 800
 PLAN_BUFFER = 500
 PRESERVED_CONTEXT_BUFFER = 500
+RECALL_BUFFER = 300
 RESPONSE_RESERVE = 1500
 TOTAL_LIMIT = 8000
 COMPRESSION_THRESHOLD = (
@@ -14,13 +16,22 @@ COMPRESSION_THRESHOLD = (
     - SYSTEM_PROMPT_BUFFER
     - PLAN_BUFFER
     - PRESERVED_CONTEXT_BUFFER
+    - RECALL_BUFFER
     - RESPONSE_RESERVE
 )
 
 
+@lru_cache(maxsize=1)
+def get_encoding():
+    """Load the tokenizer on first use instead of at import time."""
+    import tiktoken
+
+    return tiktoken.get_encoding(ENCODING_NAME)
+
+
 def count_tokens(text: str) -> int:
     """Count tokens in a string."""
-    return len(ENCODING.encode(text))
+    return len(get_encoding().encode(text))
 
 
 def estimate_tokens(messages: list[BaseMessage]) -> int: